@@ -17,6 +17,10 @@ import os
 import struct
 import zlib
 import argparse
+import hashlib
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import h5py
 
@@ -28,6 +32,12 @@ except ImportError:
     print("ERROR: pip install rasterio")
     sys.exit(1)
 
+try:
+    import deflate  # libdeflate bindings: same zlib stream as zlib.compress, ~3x faster encoder
+    HAS_LIBDEFLATE = True
+except ImportError:
+    HAS_LIBDEFLATE = False
+
 
 # ─── NISAR reader ───────────────────────────────────────────────────────────
 
@@ -42,8 +52,10 @@ def read_nisar(h5_path):
         base = f'/science/{band}/GCOV/grids/frequencyA'
 
         epsg = int(f[f'{base}/projection'][()])
-        x = f[f'{base}/xCoordinates'][:]
-        y = f[f'{base}/yCoordinates'][:]
+        # Bounds only need the end points: read 2 values per axis, not the full arrays
+        xds, yds = f[f'{base}/xCoordinates'], f[f'{base}/yCoordinates']
+        x, y = (xds[0], xds[-1]), (yds[0], yds[-1])
+        width, height = xds.shape[0], yds.shape[0]
         x_sp = abs(float(f[f'{base}/xCoordinateSpacing'][()]))
         y_sp = abs(float(f[f'{base}/yCoordinateSpacing'][()]))
 
@@ -55,7 +67,7 @@ def read_nisar(h5_path):
 
     return {
         'path': h5_path, 'band': band, 'epsg': epsg,
-        'width': len(x), 'height': len(y),
+        'width': width, 'height': height,
         'x_spacing': x_sp, 'y_spacing': y_sp,
         'bounds': [float(min(x[0],x[-1])), float(min(y[0],y[-1])),
                    float(max(x[0],x[-1])), float(max(y[0],y[-1]))],
@@ -63,8 +75,36 @@ def read_nisar(h5_path):
     }
 
 
+ROW_BAND = 64  # output rows multilooked per HDF5 read
+# HDF5 chunk cache large enough for a full row of chunks of every pol: row bands that split
+# a chunk (or revisit it for the next pol) hit the cache instead of re-inflating it
+H5_CACHE = dict(rdcc_nbytes=256 * 1024 * 1024, rdcc_nslots=100003)
+
+
+def multilook_valid(raw, ml):
+    """Box-filter multilook of a (rows*ml, cols*ml) block over valid (> 0) pixels.
+
+    Masked sum / count, 0 where a box has no valid pixel. Rows are added ml-strided, then
+    ml columns folded, which avoids a NaN-filled copy and the slow nanmean over two axes.
+    `raw` is used as scratch.
+    """
+    eh, ew = raw.shape[0] // ml, raw.shape[1] // ml
+    valid = raw > 0
+    np.copyto(raw, 0, where=~valid)
+    sums = raw[0::ml].copy(); cnts = valid[0::ml].astype(np.uint8)
+    for a in range(1, ml):
+        sums += raw[a::ml]; cnts += valid[a::ml]
+    sums = sums.reshape(eh, ew, ml).sum(axis=2)
+    cnts = cnts.reshape(eh, ew, ml).sum(axis=2, dtype=np.int32)
+    return np.divide(sums, cnts, out=np.zeros_like(sums), where=cnts > 0)
+
+
 def read_bands(meta, ml, max_rows=None):
-    """Read and multilook NISAR bands using numpy (fast)."""
+    """Read and multilook NISAR bands using numpy (fast).
+
+    Returns (stack, ew, eh): one C-contiguous float32 (nb, eh, ew) array, bands in
+    meta['pols'] order, which both writers consume as is.
+    """
     w, h = meta['width'], meta['height']
     ew, eh = w // ml, h // ml
     if max_rows:
@@ -73,26 +113,46 @@ def read_bands(meta, ml, max_rows=None):
     # Source rows to read
     src_rows = eh * ml
 
-    bands = {}
-    with h5py.File(meta['path'], 'r') as f:
+    stack = np.empty((len(meta['pols']), eh, ew), dtype=np.float32)
+    with h5py.File(meta['path'], 'r', **H5_CACHE) as f:
         base = f'/science/{meta["band"]}/GCOV/grids/frequencyA'
-        for pol in meta['pols']:
+        for pol, avg in zip(meta['pols'], stack):
             print(f"  Reading {pol} [{w}x{src_rows}] -> [{ew}x{eh}] ...", end='', flush=True)
-            raw = f[f'{base}/{pol}'][:src_rows, :ew * ml].astype(np.float32)
+            ds = f[f'{base}/{pol}']
+            # Stream ml-aligned row bands: peak memory is one band of source rows, not the
+            # whole float32 image
+            for r0 in range(0, eh, ROW_BAND):
+                r1 = min(r0 + ROW_BAND, eh)
+                raw = ds[r0 * ml:r1 * ml, :ew * ml].astype(np.float32, copy=False)
+                avg[r0:r1] = multilook_valid(raw, ml)
+
+            print(f" {np.count_nonzero(avg > 0)}/{ew*eh} valid, "
+                  f"range [{avg.min():.2e}, {avg.max():.2e}]")
+
+    return stack, ew, eh
 
-            # Box-filter multilook: reshape to (eh, ml, ew, ml) then mean
-            reshaped = raw.reshape(eh, ml, ew, ml)
-            # Replace zeros/negatives with NaN for averaging, then fill back with 0
-            reshaped = np.where(reshaped > 0, reshaped, np.nan)
-            avg = np.nanmean(reshaped, axis=(1, 3)).astype(np.float32)
-            avg = np.nan_to_num(avg, nan=0.0)
 
-            bands[pol] = avg.ravel()
-            valid = bands[pol][bands[pol] > 0]
-            print(f" {len(valid)}/{ew*eh} valid, "
-                  f"range [{bands[pol].min():.2e}, {bands[pol].max():.2e}]")
+def cache_path(h5_path, ml, max_rows):
+    """.npz cache file for (file identity, ml, rows) in the system temp dir."""
+    st = os.stat(h5_path)
+    key = f"{os.path.abspath(h5_path)}|{st.st_mtime_ns}|{st.st_size}|{ml}|{max_rows}|stack"
+    return os.path.join(tempfile.gettempdir(),
+                        f"sardine_cache_{hashlib.sha1(key.encode()).hexdigest()[:16]}.npz")
 
-    return bands, ew, eh
+
+def load_cache(path):
+    """Return (meta, stack) saved by save_cache, or None if there is no cache."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as z:
+        return json.loads(str(z['meta'])), z['stack']
+
+
+def save_cache(path, meta, stack):
+    """Persist meta + the (nb, h, w) stack; written to a temp name, then renamed into place."""
+    tmp = f"{path}.{os.getpid()}.npz"
+    np.savez(tmp, meta=json.dumps(meta), stack=stack)
+    os.replace(tmp, path)
 
 
 # ─── SARdine-style TIFF writer (exact replica of geotiff-writer.js) ─────────
@@ -100,37 +160,118 @@ def read_bands(meta, ml, max_rows=None):
 TAG_WIDTH = 256; TAG_LENGTH = 257; TAG_BPS = 258; TAG_COMPRESS = 259
 TAG_PHOTO = 262; TAG_SPP = 277; TAG_PLANAR = 284
 TAG_TILEW = 322; TAG_TILEL = 323; TAG_TILEOFF = 324; TAG_TILEBC = 325
-TAG_SFORMAT = 339; TAG_SCALE = 33550; TAG_TIEPOINT = 33922; TAG_GEOKEYS = 34735
+TAG_PREDICTOR = 317; TAG_SFORMAT = 339; TAG_SCALE = 33550; TAG_TIEPOINT = 33922; TAG_GEOKEYS = 34735
 T_SHORT = 3; T_LONG = 4; T_DOUBLE = 12
 TILE = 512
 TYPE_SZ = {T_SHORT: 2, T_LONG: 4, T_DOUBLE: 8}
+TYPE_DT = {T_SHORT: '<u2', T_LONG: '<u4', T_DOUBLE: '<f8'}
+IFD_ENTRY = np.dtype([('tag', '<u2'), ('typ', '<u2'), ('cnt', '<u4'), ('val', 'V4')])
+
+
+def compress_tile(data, level=6):
+    """zlib-wrapped Deflate (TIFF compression 8), via libdeflate when installed."""
+    if HAS_LIBDEFLATE:
+        return deflate.zlib_compress(data, level)
+    return zlib.compress(data, level)
+
+
+def float_predict(tile):
+    """TIFF floating-point predictor (Predictor=3) on a (TILE, TILE, nb) float32 tile.
+
+    Per row, the samples' bytes are split into byte planes, most significant first, then
+    horizontally differenced with a stride of nb bytes (libtiff fpDiff). Sign/exponent
+    planes of SAR backscatter are near-constant, so the stream deflates far better.
+    """
+    rows, nb = tile.shape[0], tile.shape[2]
+    planes = tile.view('<u1').reshape(rows, -1, 4)[:, :, ::-1].transpose(0, 2, 1).reshape(rows, -1)
+    out = planes.copy()
+    np.subtract(planes[:, nb:], planes[:, :-nb], out=out[:, nb:])
+    return out.tobytes()
+
+
+def compress_tile_row(ex, rows, predictor=1):
+    """Pack and compress one row of 512x512 BIP tiles from an (nb, th, w) block.
 
+    One strided (nb, th, tw) -> (th, tw, nb) copy per tile into a single reused tile
+    buffer, zero-padded at the edges; predictor=3 applies float_predict first.
+    zlib/libdeflate release the GIL, so the row's tiles compress in parallel on `ex`;
+    map() keeps tile order.
+    """
+    nb, th, w = rows.shape
+    buf = np.zeros((TILE, TILE, nb), dtype=np.float32)  # reused; tobytes() copies it out
 
-def sardine_write(path, bands, names, w, h, bounds, epsg):
+    def pack(x0):
+        tw = min(TILE, w - x0)
+        if tw < TILE:
+            buf.fill(0)  # edge tile: clear the padding (th < TILE rows stay 0 from np.zeros)
+        buf[:th, :tw] = rows[:, :, x0:x0 + tw].transpose(1, 2, 0)
+        return float_predict(buf) if predictor == 3 else buf.tobytes()
+
+    return list(ex.map(compress_tile, [pack(x0) for x0 in range(0, w, TILE)]))
+
+
+def sardine_write(path, stack, bounds, epsg, predictor=1):
     """Exact binary replica of writeFloat32GeoTIFF() from geotiff-writer.js."""
-    nb = len(names)
+    nb, h, w = stack.shape
+    tiles = []
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for y0 in range(0, h, TILE):
+            tiles.extend(compress_tile_row(ex, stack[:, y0:y0 + TILE], predictor))
+    write_tiff(path, tiles, nb, w, h, bounds, epsg, predictor)
+
+
+def sardine_write_streaming(path, meta, ml, bounds, max_rows=None, predictor=1):
+    """sardine_write fused with read_bands: one pass over the HDF5 per tile row.
+
+    Each tile row's ml*TILE source rows are read for every pol, multilooked and emitted
+    as compressed tiles straight away, so the multilooked planes never exist in full.
+    Writes the same file as read_bands + sardine_write. Returns (w, h).
+    """
+    w, h = meta['width'] // ml, meta['height'] // ml
+    if max_rows:
+        h = min(h, max_rows)
+    names = meta['pols']
+    tiles = []
+    with h5py.File(meta['path'], 'r', **H5_CACHE) as f, ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        base = f'/science/{meta["band"]}/GCOV/grids/frequencyA'
+        dss = [f[f'{base}/{pol}'] for pol in names]
+        for y0 in range(0, h, TILE):
+            y1 = min(y0 + TILE, h)
+            rows = np.empty((len(names), y1 - y0, w), dtype=np.float32)
+            for i, ds in enumerate(dss):
+                for r0 in range(y0, y1, ROW_BAND):
+                    r1 = min(r0 + ROW_BAND, y1)
+                    raw = ds[r0 * ml:r1 * ml, :w * ml].astype(np.float32, copy=False)
+                    rows[i, r0 - y0:r1 - y0] = multilook_valid(raw, ml)
+            tiles.extend(compress_tile_row(ex, rows, predictor))
+    write_tiff(path, tiles, len(names), w, h, bounds, meta['epsg'], predictor)
+    return w, h
+
+
+IOV_MAX = os.sysconf('SC_IOV_MAX') if hasattr(os, 'sysconf') else 1024
+
+
+def write_gather(fd, bufs):
+    """Write `bufs` back to back with os.writev, IOV_MAX buffers per syscall."""
+    views = [memoryview(b) for b in bufs]
+    i = 0
+    while i < len(views):
+        n = os.writev(fd, views[i:i + IOV_MAX])
+        while i < len(views) and n >= len(views[i]):  # writev may stop short
+            n -= len(views[i]); i += 1
+        if n:
+            views[i] = views[i][n:]
+
+
+def write_tiff(path, tiles, nb, w, h, bounds, epsg, predictor=1):
+    """Assemble header, IFD and compressed 512x512 BIP tiles into a GeoTIFF.
+
+    The Predictor tag is only written when predictor != 1, as the JS writer omits it.
+    """
     minx, miny, maxx, maxy = bounds
     psx = (maxx - minx) / w
     psy = (maxy - miny) / h
 
-    # Compress 512x512 BIP tiles
-    tx_n = -(-w // TILE)
-    ty_n = -(-h // TILE)
-    tiles = []
-    for ty in range(ty_n):
-        for tx in range(tx_n):
-            x0, y0 = tx * TILE, ty * TILE
-            tw = min(TILE, w - x0)
-            th = min(TILE, h - y0)
-            buf = np.zeros(TILE * TILE * nb, dtype=np.float32)
-            for py in range(th):
-                for px in range(tw):
-                    si = (y0 + py) * w + (x0 + px)
-                    di = (py * TILE + px) * nb
-                    for b in range(nb):
-                        buf[di + b] = bands[names[b]][si]
-            tiles.append(zlib.compress(buf.tobytes(), 6))
-
     # IFD entries: (tag, type, count, values[])
     entries = sorted([
         (TAG_WIDTH,    T_LONG,   1,       [w]),
@@ -148,91 +289,70 @@ def sardine_write(path, bands, names, w, h, bounds, epsg):
         (TAG_TIEPOINT, T_DOUBLE, 6,       [0,0,0, minx, maxy, 0]),
         (TAG_SCALE,    T_DOUBLE, 3,       [psx, psy, 0]),
         (TAG_GEOKEYS,  T_SHORT,  16,      [1,1,0,3, 1024,0,1,1, 1025,0,1,1, 3072,0,1,epsg]),
-    ], key=lambda e: e[0])
+    ] + ([(TAG_PREDICTOR, T_SHORT, 1, [predictor])] if predictor != 1 else []),
+        key=lambda e: e[0])
 
     # Layout: header(8) + IFD + overflow + tile data
     ifd_off = 8
     ifd_sz = 2 + len(entries) * 12 + 4
-    overflow_sz = 0
-    for _, typ, cnt, _ in entries:
-        bs = TYPE_SZ[typ] * cnt
-        if bs > 4:
-            overflow_sz += bs
-            if overflow_sz % 2: overflow_sz += 1
-
+    # Values over 4 bytes go to the overflow area, each padded to an even (word) boundary;
+    # every entry's overflow offset comes from one cumulative sum
+    sizes = np.array([TYPE_SZ[typ] * cnt for _, typ, cnt, _ in entries], dtype=np.int64)
+    ovf_sizes = np.where(sizes > 4, sizes + (sizes & 1), 0)
     ovf_off = ifd_off + ifd_sz
-    tile_off = ovf_off + overflow_sz
-    total = tile_off + sum(len(t) for t in tiles)
-    buf = bytearray(total)
+    ovf_offs = ovf_off + np.cumsum(ovf_sizes) - ovf_sizes
+    tile_off = ovf_off + int(ovf_sizes.sum())
+    buf = bytearray(tile_off)  # header + IFD + overflow only; tiles are streamed after it
 
     # Header
     struct.pack_into('<2sHI', buf, 0, b'II', 42, ifd_off)
 
-    # IFD
-    pos = ifd_off
-    struct.pack_into('<H', buf, pos, len(entries)); pos += 2
-    cur_ovf = ovf_off
-
-    for tag, typ, cnt, vals in entries:
-        bsz = TYPE_SZ[typ] * cnt
-        struct.pack_into('<HHI', buf, pos, tag, typ, cnt); pos += 8
-
-        if bsz <= 4:
-            if cnt == 1:
-                if typ == T_SHORT:
-                    struct.pack_into('<H', buf, pos, int(vals[0]))
-                elif typ == T_LONG:
-                    struct.pack_into('<I', buf, pos, int(vals[0]))
-            elif cnt == 2 and typ == T_SHORT:
-                struct.pack_into('<HH', buf, pos, int(vals[0]), int(vals[1]))
-            pos += 4
-        elif tag == TAG_TILEOFF:
-            struct.pack_into('<I', buf, pos, cur_ovf); pos += 4
-            tp = tile_off
-            for t in tiles:
-                struct.pack_into('<I', buf, cur_ovf, tp)
-                cur_ovf += 4; tp += len(t)
-            if cur_ovf % 2: cur_ovf += 1
-        else:
-            struct.pack_into('<I', buf, pos, cur_ovf); pos += 4
-            op = cur_ovf
-            for v in vals:
-                if typ == T_SHORT:
-                    struct.pack_into('<H', buf, op, int(v)); op += 2
-                elif typ == T_LONG:
-                    struct.pack_into('<I', buf, op, int(v)); op += 4
-                elif typ == T_DOUBLE:
-                    struct.pack_into('<d', buf, op, float(v)); op += 8
-            cur_ovf += bsz
-            if cur_ovf % 2: cur_ovf += 1
-
-    struct.pack_into('<I', buf, pos, 0)  # next IFD = 0
-
-    # Tile data
-    wp = tile_off
-    for t in tiles:
-        buf[wp:wp+len(t)] = t; wp += len(t)
-
-    with open(path, 'wb') as f:
+    # IFD: all 12-byte entries emitted as one structured array; `val` holds the value
+    # itself when it fits in 4 bytes, else its offset in the overflow area
+    tile_sz = np.array([len(t) for t in tiles], dtype=np.int64)
+    tile_offs = tile_off + np.cumsum(tile_sz) - tile_sz
+    # Classic TIFF offsets are 32-bit; the '<u4' cast below would wrap them silently
+    file_size = tile_off + int(tile_sz.sum())
+    if file_size >= 2**32:
+        raise ValueError(f"{file_size} bytes exceeds the 4 GiB classic TIFF limit "
+                         f"(32-bit tile offsets); BigTIFF is not supported")
+    packed = [np.asarray(tile_offs if tag == TAG_TILEOFF else vals, dtype=TYPE_DT[typ]).tobytes()
+              for tag, typ, _, vals in entries]
+    ent = np.array([(tag, typ, cnt, p.ljust(4, b'\0') if sz <= 4 else struct.pack('<I', o))
+                    for (tag, typ, cnt, _), p, sz, o in zip(entries, packed, sizes.tolist(), ovf_offs.tolist())],
+                   dtype=IFD_ENTRY)
+    struct.pack_into('<H', buf, ifd_off, len(entries))
+    buf[ifd_off + 2:ovf_off - 4] = ent.tobytes()  # next IFD offset (last 4 bytes) stays 0
+    for p, sz, o in zip(packed, sizes.tolist(), ovf_offs.tolist()):
+        if sz > 4:
+            buf[o:o + sz] = p
+
+    with open(path, 'wb', buffering=1 << 20) as f:
         f.write(buf)
+        if hasattr(os, 'writev'):
+            f.flush()
+            write_gather(f.fileno(), tiles)
+        else:
+            for t in tiles:
+                f.write(t)
 
 
 # ─── rasterio writer ────────────────────────────────────────────────────────
 
-def rasterio_write(path, bands, names, w, h, bounds, epsg):
+def rasterio_write(path, stack, bounds, epsg):
     """Write the exact same data using rasterio (the gold standard)."""
+    nb, h, w = stack.shape
     transform = from_bounds(bounds[0], bounds[1], bounds[2], bounds[3], w, h)
     with rasterio.open(
         path, 'w', driver='GTiff',
         width=w, height=h,
-        count=len(names), dtype='float32',
+        count=nb, dtype='float32',
         crs=CRS.from_epsg(epsg),
         transform=transform,
         tiled=True, blockxsize=512, blockysize=512,
         compress='deflate',
     ) as dst:
-        for i, name in enumerate(names):
-            dst.write(bands[name].reshape(h, w), i + 1)
+        dst.write(stack)
 
 
 # ─── Comparison ──────────────────────────────────────────────────────────────
@@ -313,6 +433,14 @@ def main():
     parser.add_argument('--rows', type=int, default=None,
                         help='Max output rows (default: all)')
     parser.add_argument('--outdir', default='test/data', help='Output directory')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write the SARdine TIF straight from the HDF5, one tile row at a time')
+    parser.add_argument('--predictor', type=int, choices=(1, 3), default=1,
+                        help='TIFF predictor for the SARdine TIF: 1 = none (matches the JS '
+                             'writer), 3 = floating point')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always re-read the HDF5 (default: reuse multilooked bands cached '
+                             'in the temp dir for this file, --ml and --rows)')
     args = parser.parse_args()
 
     # Find an H5 file
@@ -330,9 +458,14 @@ def main():
 
     os.makedirs(args.outdir, exist_ok=True)
 
-    # Read metadata
-    meta = read_nisar(h5)
+    # Read metadata (and the multilooked bands, if an earlier run cached them)
     ml = args.ml
+    cache = None if args.no_cache else cache_path(h5, ml, args.rows)
+    cached = load_cache(cache) if cache else None
+    if cached:
+        meta, stack = cached
+    else:
+        meta = read_nisar(h5)
     ew, eh_full = meta['width'] // ml, meta['height'] // ml
 
     print(f"\nSource: {os.path.basename(h5)}")
@@ -342,7 +475,13 @@ def main():
     print(f"  Multilook: {ml}x  ->  {ew} x {eh_full}")
 
     # Read bands
-    bands, w, h = read_bands(meta, ml, max_rows=args.rows)
+    if cached:
+        print(f"  Bands from cache: {cache}")
+    else:
+        stack = read_bands(meta, ml, max_rows=args.rows)[0]
+        if cache:
+            save_cache(cache, meta, stack)
+    h, w = stack.shape[1:]
 
     # Pixel-edge bounds (same correction as main.jsx lines 817-822)
     sx, sy = meta['x_spacing'], meta['y_spacing']
@@ -366,11 +505,15 @@ def main():
 
     # Write both
     print(f"\nWriting SARdine-style: {sardine_tif}")
-    sardine_write(sardine_tif, bands, names, w, h, pixel_edge_bounds, epsg)
+    if args.stream:
+        sardine_write_streaming(sardine_tif, meta, ml, pixel_edge_bounds, max_rows=args.rows,
+                                predictor=args.predictor)
+    else:
+        sardine_write(sardine_tif, stack, pixel_edge_bounds, epsg, args.predictor)
     print(f"  {os.path.getsize(sardine_tif) / 1e6:.1f} MB")
 
     print(f"\nWriting rasterio:      {rasterio_tif}")
-    rasterio_write(rasterio_tif, bands, names, w, h, pixel_edge_bounds, epsg)
+    rasterio_write(rasterio_tif, stack, pixel_edge_bounds, epsg)
     print(f"  {os.path.getsize(rasterio_tif) / 1e6:.1f} MB")
 
     # Compare
@@ -9,7 +9,7 @@ Usage:
     python test/scripts/generate-h5py-ground-truth.py <h5-file> > truth.json
 
 Requirements:
-    pip install h5py numpy
+    pip install h5py numpy  (orjson optional, for faster JSON output)
 """
 
 import sys
@@ -18,6 +18,14 @@ import h5py
 import numpy as np
 from pathlib import Path
 
+try:
+    import orjson  # C serializer with native numpy support; output bytes go straight to stdout
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+H5Dataset = h5py.Dataset
+
 
 def serialize_numpy(obj):
     """Convert numpy types to JSON-serializable types"""
@@ -32,8 +40,49 @@ def serialize_numpy(obj):
     return obj
 
 
+def describe_dataset(path, item):
+    """Collect shape, dtype, layout, compression and fillvalue of one dataset"""
+    # shape/dtype are re-read from libhdf5 on every property access: fetch each once.
+    # str(dtype) already is the simple form ('float32', '>f4'), so no per-kind rewriting
+    shape = item.shape
+    dataset_info = {
+        'path': path,
+        'name': path.rsplit('/', 1)[-1],
+        'shape': list(shape),
+        'dtype': str(item.dtype),
+        'size': int(np.prod(shape, dtype=np.int64)),
+    }
+
+    # Check if chunked
+    chunks = item.chunks
+    if chunks:
+        dataset_info['chunks'] = list(chunks)
+        dataset_info['layout'] = 'chunked'
+    else:
+        dataset_info['layout'] = 'contiguous'
+
+    # Get compression info
+    compression = item.compression
+    if compression:
+        dataset_info['compression'] = compression
+        compression_opts = item.compression_opts
+        if compression_opts:
+            dataset_info['compression_opts'] = compression_opts
+
+    # Get fillvalue
+    fillvalue = item.fillvalue
+    if fillvalue is not None:
+        dataset_info['fillvalue'] = serialize_numpy(fillvalue)
+
+    return dataset_info
+
+
 def walk_datasets(group, path='/', datasets=None):
-    """Recursively walk HDF5 groups and collect datasets"""
+    """Recursively walk HDF5 groups and collect datasets
+
+    Every link path is listed, so datasets reached through soft links or extra
+    hard links appear once per path (Group.visititems would visit each object once).
+    """
     if datasets is None:
         datasets = []
 
@@ -41,41 +90,8 @@ def walk_datasets(group, path='/', datasets=None):
         item_path = f"{path}{key}" if path.endswith('/') else f"{path}/{key}"
         item = group[key]
 
-        if isinstance(item, h5py.Dataset):
-            dtype_str = str(item.dtype)
-            # Simplify dtype string
-            if dtype_str.startswith('<f'):
-                dtype_str = f'<f{item.dtype.itemsize}'
-            elif dtype_str.startswith('>f'):
-                dtype_str = f'>f{item.dtype.itemsize}'
-
-            dataset_info = {
-                'path': item_path,
-                'name': key,
-                'shape': list(item.shape),
-                'dtype': dtype_str,
-                'size': int(item.size),
-            }
-
-            # Check if chunked
-            if item.chunks:
-                dataset_info['chunks'] = list(item.chunks)
-                dataset_info['layout'] = 'chunked'
-            else:
-                dataset_info['layout'] = 'contiguous'
-
-            # Get compression info
-            if item.compression:
-                dataset_info['compression'] = item.compression
-                if item.compression_opts:
-                    dataset_info['compression_opts'] = item.compression_opts
-
-            # Get fillvalue
-            if item.fillvalue is not None:
-                dataset_info['fillvalue'] = serialize_numpy(item.fillvalue)
-
-            datasets.append(dataset_info)
-
+        if isinstance(item, H5Dataset):
+            datasets.append(describe_dataset(item_path, item))
         elif isinstance(item, h5py.Group):
             walk_datasets(item, item_path, datasets)
 
@@ -125,8 +141,19 @@ def sample_data(dataset, max_samples=100):
         cols = min(n, shape[1])
         return dataset[:rows, :cols].flatten().tolist()
     else:
-        # Higher dimensions, just sample first slice
-        return dataset.flat[:max_samples].tolist()
+        # Higher dimensions: one corner hyperslab of at most max_samples values, so only the
+        # leading chunk(s) are decompressed (h5py datasets have no .flat)
+        # Each axis takes about the m-th root of the remaining budget (m = remaining axes
+        # longer than 1), or more when the axes after it cannot absorb the rest
+        sel, rem = [], max_samples
+        for i, dim in enumerate(shape):
+            rest = shape[i + 1:]
+            m = sum(d > 1 for d in shape[i:])
+            root = int(rem ** (1 / m) + 1e-9) if m else 1
+            k = min(dim, max(1, root, rem // int(np.prod(rest, dtype=np.int64))))
+            sel.append(slice(0, k))
+            rem //= k
+        return dataset[tuple(sel)].ravel().tolist()
 
 
 def main():
@@ -215,7 +242,12 @@ def main():
 
         # Output JSON
         print("# Writing JSON...", file=sys.stderr)
-        json.dump(output, sys.stdout, indent=2, default=serialize_numpy)
+        if HAS_ORJSON:
+            sys.stdout.buffer.write(orjson.dumps(
+                output, default=serialize_numpy,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            json.dump(output, sys.stdout, indent=2, default=serialize_numpy)
         print("", file=sys.stderr)
         print(f"# Done! Generated ground truth with {len(datasets)} datasets", file=sys.stderr)
 
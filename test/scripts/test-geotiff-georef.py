@@ -16,6 +16,7 @@ Usage:
 import sys
 import os
 import struct
+from functools import lru_cache
 import numpy as np
 import h5py
 
@@ -32,6 +33,11 @@ H5_PATH = (
     else 'test/data/NISAR_L2_PR_GCOV_013_155_D_091_2005_DHDH_A_20251226T231525_20251226T231556_P05006_N_F_J_001.h5'
 )
 
+# HDF5 raw-data chunk cache for the NISAR file (h5py default is 1 MiB,
+# smaller than a single GCOV chunk). nslots is a prime ~100x the chunks held.
+H5_CHUNK_CACHE = dict(rdcc_nbytes=64 * 1024 * 1024, rdcc_nslots=5003,
+                      rdcc_w0=0.75)
+
 # ---- TIFF constants (matching geotiff-writer.js) ----
 TAG_IMAGE_WIDTH = 256
 TAG_IMAGE_LENGTH = 257
@@ -53,6 +59,13 @@ TYPE_SHORT = 3
 TYPE_LONG = 4
 TYPE_DOUBLE = 12
 
+# TIFF type -> (byte size, struct format char, little-endian NumPy dtype)
+TYPE_INFO = {
+    TYPE_SHORT: (2, 'H', '<u2'),
+    TYPE_LONG: (4, 'I', '<u4'),
+    TYPE_DOUBLE: (8, 'd', '<f8'),
+}
+
 KEY_GT_MODEL_TYPE = 1024
 KEY_GT_RASTER_TYPE = 1025
 KEY_PROJECTED_CS_TYPE = 3072
@@ -61,16 +74,51 @@ MODEL_TYPE_PROJECTED = 1
 MODEL_TYPE_GEOGRAPHIC = 2
 RASTER_TYPE_PIXEL_IS_AREA = 1
 
+# Precompiled little-endian packers (format strings are parsed once)
+_HEADER = struct.Struct('<2sHI')
+_ENTRY = struct.Struct('<HHI')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
 
-def write_minimal_geotiff(path, width, height, bounds, epsg, rgba_data):
-    """Write a minimal stripped GeoTIFF matching geotiff-writer.js logic."""
+
+@lru_cache(maxsize=None)
+def _array_struct(typ, count):
+    """Cached Struct packing `count` values of TIFF type `typ` in one call."""
+    return struct.Struct(f'<{count}{TYPE_INFO[typ][1]}')
+
+
+def _pixel_scale(width, height, bounds):
+    """Pixel size from bounds and raster shape.
+
+    This matches geotiff-writer.js buildCOGFile() lines 393-394:
+    pixelScaleX = (maxX - minX) / levels[0].width
+    pixelScaleY = (maxY - minY) / levels[0].height
+    """
     min_x, min_y, max_x, max_y = bounds
+    return (max_x - min_x) / width, (max_y - min_y) / height
+
+
+def _geo_keys(epsg):
+    """GeoKeyDirectory values for an EPSG code (geographic vs projected)."""
+    is_geographic = 4000 <= epsg < 5000
+    model_type = MODEL_TYPE_GEOGRAPHIC if is_geographic else MODEL_TYPE_PROJECTED
+    cs_key = KEY_GEOGRAPHIC_TYPE if is_geographic else KEY_PROJECTED_CS_TYPE
+    return [
+        1, 1, 0, 3,
+        KEY_GT_MODEL_TYPE, 0, 1, model_type,
+        KEY_GT_RASTER_TYPE, 0, 1, RASTER_TYPE_PIXEL_IS_AREA,
+        cs_key, 0, 1, epsg,
+    ]
+
 
-    # This matches geotiff-writer.js buildCOGFile() lines 393-394:
-    # pixelScaleX = (maxX - minX) / levels[0].width
-    # pixelScaleY = (maxY - minY) / levels[0].height
-    pixel_scale_x = (max_x - min_x) / width
-    pixel_scale_y = (max_y - min_y) / height
+def _build_ifd(width, height, bounds, epsg):
+    """Build header + IFD + overflow for the RGBA strip layout.
+
+    Returns (buf, slots) where slots maps each tag to the byte offset of
+    its value(s) in buf. The pixel strip starts at len(buf).
+    """
+    min_x, min_y, max_x, max_y = bounds
+    pixel_scale_x, pixel_scale_y = _pixel_scale(width, height, bounds)
 
     # Build IFD entries as (tag, type, count, value_or_values)
     entries = []
@@ -94,108 +142,138 @@ def write_minimal_geotiff(path, width, height, bounds, epsg, rgba_data):
     entries.append((TAG_MODEL_PIXEL_SCALE, TYPE_DOUBLE, 3, [pixel_scale_x, pixel_scale_y, 0]))
 
     # GeoKeyDirectory
-    is_geographic = 4000 <= epsg < 5000
-    model_type = MODEL_TYPE_GEOGRAPHIC if is_geographic else MODEL_TYPE_PROJECTED
-    cs_key = KEY_GEOGRAPHIC_TYPE if is_geographic else KEY_PROJECTED_CS_TYPE
-    geo_keys = [
-        1, 1, 0, 3,
-        KEY_GT_MODEL_TYPE, 0, 1, model_type,
-        KEY_GT_RASTER_TYPE, 0, 1, RASTER_TYPE_PIXEL_IS_AREA,
-        cs_key, 0, 1, epsg,
-    ]
+    geo_keys = _geo_keys(epsg)
     entries.append((TAG_GEO_KEY_DIRECTORY, TYPE_SHORT, len(geo_keys), geo_keys))
 
-    # Sort by tag
-    entries.sort(key=lambda e: e[0])
+    # Sort by tag (tags are unique, so plain tuple ordering suffices)
+    entries.sort()
 
     # Calculate sizes
-    type_sizes = {TYPE_SHORT: 2, TYPE_LONG: 4, TYPE_DOUBLE: 8}
     header_size = 8
     num_entries = len(entries)
     ifd_size = 2 + num_entries * 12 + 4
 
-    # Overflow data (values that don't fit in 4 bytes)
-    overflow_entries = []
-    overflow_size = 0
-    for i, (tag, typ, count, values) in enumerate(entries):
-        byte_size = type_sizes[typ] * count
-        if byte_size > 4:
-            overflow_entries.append(i)
-            overflow_size += byte_size
-            if overflow_size % 2 != 0:
-                overflow_size += 1
+    # Overflow data (values that don't fit in 4 bytes), laid out in one
+    # pass: each overflow array is padded to a word boundary and its
+    # offset is the exclusive prefix sum of the padded sizes
+    byte_sizes = np.array([TYPE_INFO[typ][0] * count
+                           for _, typ, count, _ in entries], dtype=np.int64)
+    overflow_sizes = np.where(byte_sizes > 4, byte_sizes + (byte_sizes & 1), 0)
+    overflow_size = int(overflow_sizes.sum())
 
     ifd_offset = header_size
     overflow_offset = ifd_offset + ifd_size
     strip_offset = overflow_offset + overflow_size
-    strip_size = width * height * 4
-    total_size = strip_offset + strip_size
+    value_offsets = (overflow_offset + np.cumsum(overflow_sizes)
+                     - overflow_sizes).tolist()
 
-    # Fix strip offset
-    for i, (tag, typ, count, values) in enumerate(entries):
-        if tag == TAG_STRIP_OFFSETS:
-            entries[i] = (tag, typ, count, [strip_offset])
-
-    buf = bytearray(total_size)
-    view = memoryview(buf)
+    # Only header + IFD + overflow are staged; the pixel strip is written
+    # to the file directly from rgba_data
+    buf = bytearray(strip_offset)
 
     # TIFF header
-    struct.pack_into('<2sHI', buf, 0, b'II', 42, ifd_offset)
+    _HEADER.pack_into(buf, 0, b'II', 42, ifd_offset)
 
     # IFD
     pos = ifd_offset
-    struct.pack_into('<H', buf, pos, num_entries)
+    _U16.pack_into(buf, pos, num_entries)
     pos += 2
 
-    cur_overflow = overflow_offset
-    for i, (tag, typ, count, values) in enumerate(entries):
-        byte_size = type_sizes[typ] * count
+    # Byte offset of each tag's values (inline field or overflow array)
+    slots = {}
 
-        struct.pack_into('<HHI', buf, pos, tag, typ, count)
+    for (tag, typ, count, values), byte_size, value_offset in zip(
+            entries, byte_sizes.tolist(), value_offsets):
+        _ENTRY.pack_into(buf, pos, tag, typ, count)
         pos += 8
 
         if byte_size > 4:
+            slots[tag] = value_offset
             # Pointer to overflow
-            struct.pack_into('<I', buf, pos, cur_overflow)
+            _U32.pack_into(buf, pos, value_offset)
             # Write overflow data
-            opos = cur_overflow
-            for v in values:
-                if typ == TYPE_SHORT:
-                    struct.pack_into('<H', buf, opos, int(v))
-                    opos += 2
-                elif typ == TYPE_LONG:
-                    struct.pack_into('<I', buf, opos, int(v))
-                    opos += 4
-                elif typ == TYPE_DOUBLE:
-                    struct.pack_into('<d', buf, opos, float(v))
-                    opos += 8
-            cur_overflow += byte_size
-            if cur_overflow % 2 != 0:
-                cur_overflow += 1
+            buf[value_offset:value_offset + byte_size] = np.asarray(
+                values, dtype=TYPE_INFO[typ][2]).tobytes()
+        elif tag == TAG_STRIP_OFFSETS:
+            # Value field is patched once the IFD is written
+            strip_offset_field = pos
         else:
+            slots[tag] = pos
             # Inline value
-            if count == 1:
-                if typ == TYPE_SHORT:
-                    struct.pack_into('<H', buf, pos, int(values[0]))
-                elif typ == TYPE_LONG:
-                    struct.pack_into('<I', buf, pos, int(values[0]))
-            else:
-                vpos = pos
-                for v in values:
-                    if typ == TYPE_SHORT:
-                        struct.pack_into('<H', buf, vpos, int(v))
-                        vpos += 2
+            _array_struct(typ, count).pack_into(buf, pos, *values)
 
         pos += 4
 
     # Next IFD pointer = 0
-    struct.pack_into('<I', buf, pos, 0)
+    _U32.pack_into(buf, pos, 0)
+
+    # Patch the strip offset placeholder
+    _U32.pack_into(buf, strip_offset_field, strip_offset)
+
+    return buf, slots
+
+
+def _build_template():
+    """Serialize the IFD once with placeholder values.
+
+    Only width/height/bounds/epsg vary between calls and none of them
+    change the entry set or the overflow layout, so write_minimal_geotiff
+    copies this blob and patches the value slots instead of rebuilding
+    and laying out the entries list every time.
+    """
+    buf, slots = _build_ifd(1, 1, (0.0, 0.0, 1.0, 1.0), 4326)
+    return bytes(buf), slots
 
-    # Write pixel data
-    buf[strip_offset:strip_offset + strip_size] = bytes(rgba_data)
 
-    with open(path, 'wb') as f:
-        f.write(buf)
+_TEMPLATE, _SLOTS = _build_template()
+_TIEPOINT = _array_struct(TYPE_DOUBLE, 6)
+_PIXEL_SCALE = _array_struct(TYPE_DOUBLE, 3)
+_GEO_KEYS = _array_struct(TYPE_SHORT, 16)
+
+
+def write_minimal_geotiff(path, width, height, bounds, epsg, rgba_data):
+    """Write a minimal stripped GeoTIFF matching geotiff-writer.js logic.
+
+    rgba_data is any C-contiguous buffer of width*height*4 bytes (bytes,
+    bytearray, uint8 ndarray or np.memmap). It is streamed to the file
+    after the header, so large strips never need a file-sized buffer.
+
+    path may also be a writable binary file object (e.g. io.BytesIO), so
+    batched checks can verify via rasterio.io.MemoryFile without a
+    filesystem round-trip per file.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    pixel_scale_x, pixel_scale_y = _pixel_scale(width, height, bounds)
+    strip_size = width * height * 4
+
+    # Patch the per-call values into a copy of the precomputed IFD
+    buf = bytearray(_TEMPLATE)
+    _U32.pack_into(buf, _SLOTS[TAG_IMAGE_WIDTH], width)
+    _U32.pack_into(buf, _SLOTS[TAG_IMAGE_LENGTH], height)
+    _U32.pack_into(buf, _SLOTS[TAG_ROWS_PER_STRIP], height)
+    _U32.pack_into(buf, _SLOTS[TAG_STRIP_BYTE_COUNTS], strip_size)
+    _TIEPOINT.pack_into(buf, _SLOTS[TAG_MODEL_TIEPOINT], 0, 0, 0, min_x, max_y, 0)
+    _PIXEL_SCALE.pack_into(buf, _SLOTS[TAG_MODEL_PIXEL_SCALE],
+                           pixel_scale_x, pixel_scale_y, 0)
+    _GEO_KEYS.pack_into(buf, _SLOTS[TAG_GEO_KEY_DIRECTORY], *_geo_keys(epsg))
+
+    # Pixel data (any C-contiguous buffer: bytes, bytearray, uint8
+    # ndarray) goes straight from its memory to the file
+    pixels = memoryview(rgba_data).cast('B')
+    if pixels.nbytes != strip_size:
+        raise ValueError(f"rgba_data is {pixels.nbytes} bytes, expected "
+                         f"width*height*4 = {strip_size}")
+
+    # 1 MiB BufferedWriter: the small header section is buffered, while
+    # the pixel memoryview (larger than the buffer) is handed to the OS
+    # directly without an extra copy
+    if hasattr(path, 'write'):
+        path.write(buf)
+        path.write(pixels)
+    else:
+        with open(path, 'wb', buffering=1 << 20) as f:
+            f.write(buf)
+            f.write(pixels)
 
     return pixel_scale_x, pixel_scale_y
 
@@ -207,41 +285,48 @@ def main():
     print(f"HDF5 file: {os.path.basename(H5_PATH)}\n")
 
     # ---- Step 1: Read HDF5 ----
-    with h5py.File(H5_PATH, 'r') as f:
-        band = None
-        for b in ['LSAR', 'SSAR']:
-            if f'/science/{b}/GCOV/grids/frequencyA' in f:
-                band = b
-                break
+    with h5py.File(H5_PATH, 'r', **H5_CHUNK_CACHE) as f:
+        # Check the band group's direct membership first so an absent
+        # band costs one link lookup, not a full path traversal
+        science = f.get('science', {})
+        band = next((b for b in ('LSAR', 'SSAR')
+                     if b in science
+                     and 'GCOV/grids/frequencyA' in science[b]), None)
         assert band, "Could not find LSAR or SSAR"
 
         freq = 'A'
         base = f'/science/{band}/GCOV/grids/frequency{freq}'
-
-        epsg = int(f[f'{base}/projection'][()])
-        x_coords = f[f'{base}/xCoordinates'][:]
-        y_coords = f[f'{base}/yCoordinates'][:]
-        x_spacing = float(f[f'{base}/xCoordinateSpacing'][()])
-        y_spacing = float(f[f'{base}/yCoordinateSpacing'][()])
-
-    width_full = len(x_coords)
-    height_full = len(y_coords)
-
-    min_x = min(x_coords[0], x_coords[-1])
-    max_x = max(x_coords[0], x_coords[-1])
-    min_y = min(y_coords[0], y_coords[-1])
-    max_y = max(y_coords[0], y_coords[-1])
+        # Resolve the grid group once; member lookups are then relative
+        grid = f[base]
+
+        epsg = int(grid['projection'][()])
+        # Only the grid size and end coordinates are needed: take the
+        # length from the shape and read just the first/last element, so
+        # at most two chunks per axis are decompressed
+        dset_x = grid['xCoordinates']
+        dset_y = grid['yCoordinates']
+        width_full = dset_x.shape[0]
+        height_full = dset_y.shape[0]
+        x_ends = (float(dset_x[0]), float(dset_x[-1]))
+        y_ends = (float(dset_y[0]), float(dset_y[-1]))
+        x_spacing = float(grid['xCoordinateSpacing'][()])
+        y_spacing = float(grid['yCoordinateSpacing'][()])
+
+    min_x, max_x = min(x_ends), max(x_ends)
+    min_y, max_y = min(y_ends), max(y_ends)
     raw_bounds = [min_x, min_y, max_x, max_y]
 
     print(f"EPSG: {epsg}")
     print(f"Dimensions: {width_full} x {height_full}")
-    print(f"Native spacing: {abs(x_spacing):.6f} x {abs(y_spacing):.6f}")
+    abs_x = abs(x_spacing)
+    abs_y = abs(y_spacing)
+    print(f"Native spacing: {abs_x:.6f} x {abs_y:.6f}")
     print(f"Raw bounds (pixel-center): [{min_x:.2f}, {min_y:.2f}, {max_x:.2f}, {max_y:.2f}]")
 
     # ---- Step 2: Apply pixel-center → pixel-edge correction ----
     # This is what main.jsx export handler now does:
-    half_px = abs(x_spacing) / 2
-    half_py = abs(y_spacing) / 2
+    half_px = abs_x * 0.5
+    half_py = abs_y * 0.5
     export_bounds = [
         min_x - half_px,
         min_y - half_py,
@@ -254,12 +339,10 @@ def main():
     # Use a small test image but with the FULL bounds (same as real export)
     test_w = 64
     test_h = 64
-    test_rgba = bytearray(test_w * test_h * 4)
-    for i in range(test_w * test_h):
-        test_rgba[i * 4] = 255      # R
-        test_rgba[i * 4 + 1] = 0    # G
-        test_rgba[i * 4 + 2] = 0    # B
-        test_rgba[i * 4 + 3] = 255  # A
+    # Solid opaque red: one RGBA pixel as a little-endian uint32
+    # (bytes R, G, B, A = FF 00 00 FF), filled with a single np.full
+    pixel = 0xFF0000FF
+    test_rgba = np.full(test_w * test_h, pixel, dtype='<u4')
 
     out_path = 'test/data/test_georef_jswriter.tif'
     ps_x, ps_y = write_minimal_geotiff(out_path, test_w, test_h, export_bounds, epsg, test_rgba)
@@ -269,13 +352,16 @@ def main():
 
     # ---- Step 4: Also test with full-res dimensions ----
     # Simulate the pixel scale calculation with actual export dimensions (e.g., 4×4 multilook)
-    for ml in [1, 4, 8]:
-        ew = width_full // ml if ml > 1 else min(width_full, 4096)
-        eh = height_full // ml if ml > 1 else min(height_full, 4096)
-        ps_x_ml = (export_bounds[2] - export_bounds[0]) / ew
-        ps_y_ml = (export_bounds[3] - export_bounds[1]) / eh
-        expected_ps = abs(x_spacing) * ml
-        diff = abs(ps_x_ml - expected_ps)
+    # All multilook factors are evaluated as arrays; only printing loops
+    mls = np.array([1, 4, 8], dtype=np.int64)
+    ews = np.where(mls > 1, width_full // mls, min(width_full, 4096))
+    ehs = np.where(mls > 1, height_full // mls, min(height_full, 4096))
+    ps_x_mls = (export_bounds[2] - export_bounds[0]) / ews
+    expected = abs_x * mls
+    diffs = np.abs(ps_x_mls - expected)
+    for ml, ew, eh, ps_x_ml, expected_ps, diff in zip(
+            mls.tolist(), ews.tolist(), ehs.tolist(), ps_x_mls.tolist(),
+            expected.tolist(), diffs.tolist()):
         status = "PASS" if diff < 0.01 else "FAIL"
         print(f"  [{status}] {ml}×{ml} multilook: {ew}x{eh} → pixel scale {ps_x_ml:.6f}m (expected {expected_ps:.1f}m, diff={diff:.6f})")
 
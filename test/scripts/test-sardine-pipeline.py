@@ -12,18 +12,30 @@ Steps:
   2. Apply main.jsx bounds correction (pixel-center → pixel-edge)
   3. Compute export dimensions (integer multilook)
   4. Read actual data with box-filter multilook
-  5. Write GeoTIFF with our JS-style writer AND rasterio
-  6. Load BOTH in rasterio and compare
+  5. Write GeoTIFF with our JS-style writer (AND rasterio with --write-ref)
+  6. Load in rasterio and compare (against the reference or source stripes)
   7. Verify against HDF5 source truth
 
 Usage:
-    python3 test/scripts/test-sardine-pipeline.py [path-to-h5]
+    python3 test/scripts/test-sardine-pipeline.py [path-to-h5] [--write-ref]
+        [--float16]
+
+    --write-ref   also write a rasterio reference GeoTIFF and compare the
+                  JS-style file against it (default: compare against the
+                  source stripes only)
+    --float16     also write a float16 variant and check it decodes to the
+                  float16-rounded source
 """
 
+import argparse
 import sys
 import os
 import struct
+import tempfile
 import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import numpy as np
 import h5py
 
@@ -35,6 +47,19 @@ except ImportError:
     print("ERROR: rasterio not found")
     sys.exit(1)
 
+# Optional: libdeflate via imagecodecs is ~2-3x faster than stdlib zlib and
+# emits standard zlib-wrapped DEFLATE streams, so TIFF readers are unaffected.
+try:
+    from imagecodecs import deflate_encode as _deflate_encode
+except ImportError:
+    _deflate_encode = None
+
+# Optional: numba JIT for the BIP tile interleave
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 
 # TIFF constants
 TAG_IMAGE_WIDTH = 256
@@ -58,6 +83,16 @@ TYPE_LONG = 4
 TYPE_DOUBLE = 12
 TILE_SIZE = 512
 
+# TIFF type -> little-endian NumPy dtype for overflow arrays
+TYPE_DTYPES = {TYPE_SHORT: '<u2', TYPE_LONG: '<u4', TYPE_DOUBLE: '<f8'}
+
+# HDF5 raw-data chunk cache for the shared NISAR handle (h5py default is
+# 1 MiB), large enough that neighbouring polarizations reuse chunk reads.
+# nslots is a prime well above the number of chunks held. Used as-is for
+# contiguous datasets; h5_chunk_cache() sizes it from the chunk layout.
+H5_CHUNK_CACHE = dict(rdcc_nbytes=256 * 1024 * 1024, rdcc_nslots=10007,
+                      rdcc_w0=0.75)
+
 H5_FILES = [
     'test/data/NISAR_L2_PR_GCOV_013_155_D_091_2005_DHDH_A_20251226T231525_20251226T231556_P05006_N_F_J_001.h5',
     'test/data/NISAR_L2_PR_GCOV_013_120_D_075_2005_QPDH_A_20251224T125029_20251224T125103_P05006_N_F_J_001.h5',
@@ -65,6 +100,26 @@ H5_FILES = [
 ]
 
 
+def deflate(data, level=6):
+    """DEFLATE-compress bytes (zlib wrapper), preferring libdeflate."""
+    if _deflate_encode is not None:
+        return _deflate_encode(data, level=level)
+    return zlib.compress(data, level)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _interleave_tile(out, band_stack, y0, x0, tile_h, tile_w):
+        """Gather a (bands, H, W) window into a BIP (TILE, TILE, bands) tile."""
+        num_bands = band_stack.shape[0]
+        for py in prange(tile_h):
+            for px in range(tile_w):
+                for b in range(num_bands):
+                    out[py, px, b] = band_stack[b, y0 + py, x0 + px]
+else:
+    _interleave_tile = None
+
+
 def read_nisar_metadata(h5_path):
     """Read NISAR GCOV metadata — same logic as nisar-loader.js."""
     with h5py.File(h5_path, 'r') as f:
@@ -94,10 +149,14 @@ def read_nisar_metadata(h5_path):
 
         # Find 2D datasets (these are the actual data bands)
         data_shape = None
+        data_chunks = None
+        data_itemsize = None
         for pol in pols:
             path = f'{base}/{pol}'
             if path in f and len(f[path].shape) == 2:
                 data_shape = f[path].shape
+                data_chunks = f[path].chunks
+                data_itemsize = f[path].dtype.itemsize
                 break
 
     width = len(x_coords)
@@ -120,44 +179,107 @@ def read_nisar_metadata(h5_path):
         'y_spacing': abs(y_spacing),
         'pols': pols,
         'data_shape': data_shape,
+        'data_chunks': data_chunks,
+        'data_itemsize': data_itemsize,
     }
 
 
-def read_nisar_band_stripe(h5_path, meta, pol, start_row, num_rows, ml):
-    """Read a stripe of data with box-filter multilook — same as getExportStripe."""
+def h5_chunk_cache(meta, num_rows, ml):
+    """h5py.File chunk-cache kwargs sized to hold one export stripe's chunks.
+
+    Every chunk the stripe touches stays resident (rows rounded up to whole
+    chunk rows, across the full width), so no chunk is decompressed twice.
+    """
+    chunks = meta['data_chunks']
+    if not chunks:
+        return H5_CHUNK_CACHE
+    chunk_bytes = chunks[0] * chunks[1] * meta['data_itemsize']
+    chunk_rows = -(-min(num_rows * ml, meta['height']) // chunks[0])
+    chunk_cols = -(-meta['width'] // chunks[1])
+    return dict(rdcc_nbytes=chunk_rows * chunk_cols * chunk_bytes,
+                rdcc_nslots=65537, rdcc_w0=0.75)
+
+
+def read_stripe_block(h5, meta, pol, start_row, num_rows, ml):
+    """Read the full-resolution source rows behind an export stripe.
+
+    h5 is a path or an already-open h5py.File (reused across bands).
+    Returns a (num_rows*ml, export_width*ml) array, or None if the
+    polarization is missing.
+    """
     export_width = meta['width'] // ml
     band = meta['band']
     freq = meta['freq']
     base = f'/science/{band}/GCOV/grids/frequency{freq}'
 
-    out = np.zeros(export_width * num_rows, dtype=np.float32)
-
-    with h5py.File(h5_path, 'r') as f:
+    opened = nullcontext(h5) if isinstance(h5, h5py.File) else h5py.File(h5, 'r')
+    with opened as f:
         ds_path = f'{base}/{pol}'
         if ds_path not in f:
-            return out
+            return None
         ds = f[ds_path]
 
-        for oy in range(num_rows):
-            for ox in range(export_width):
-                sx0 = ox * ml
-                sy0 = (start_row + oy) * ml
-                sx1 = min(sx0 + ml, meta['width'])
-                sy1 = min(sy0 + ml, meta['height'])
+        # One hyperslab read for the whole stripe, decoded straight into a
+        # preallocated buffer. A short final stripe leaves zero rows at the
+        # bottom; zeros are invalid and drop out of the average.
+        row0 = start_row * ml
+        row1 = min((start_row + num_rows) * ml, meta['height'])
+        col1 = export_width * ml
+        block = np.zeros((num_rows * ml, col1), dtype=ds.dtype)
+        ds.read_direct(block, np.s_[row0:row1, 0:col1],
+                       np.s_[0:row1 - row0, 0:col1])
+
+    return block
+
+
+def multilook_stripe(block, num_rows, export_width, ml, out=None):
+    """Box-filter a source block: average valid (>0) values of each ml×ml cell.
+
+    Writes into out (a (num_rows, export_width) float32 array, e.g. one
+    band of a preallocated stack) when given; returns the flat stripe.
+    """
+    if out is None:
+        out = np.empty((num_rows, export_width), dtype=np.float32)
+    if block is None:
+        out[...] = 0
+        return out.ravel()
 
-                # Read the ml×ml block
-                block = ds[sy0:sy1, sx0:sx1]
-                # Box-filter: average valid (>0) values
-                valid = block[block > 0]
-                if len(valid) > 0:
-                    out[oy * export_width + ox] = np.mean(valid)
+    b4 = block.reshape(num_rows, ml, export_width, ml)
+    mask = b4 > 0
+    counts = mask.sum(axis=(1, 3))
+    sums = np.where(mask, b4, 0).sum(axis=(1, 3), dtype=np.float64)
+    # Cells with no valid samples have a zero sum, so dividing by 1 gives 0
+    np.divide(sums, np.maximum(counts, 1), out=out, casting='unsafe')
 
-    return out
+    return out.ravel()
+
+
+def read_nisar_band_stripe(h5, meta, pol, start_row, num_rows, ml):
+    """Read a stripe of data with box-filter multilook — same as getExportStripe.
+
+    h5 is a path or an already-open h5py.File.
+    """
+    block = read_stripe_block(h5, meta, pol, start_row, num_rows, ml)
+    return multilook_stripe(block, num_rows, meta['width'] // ml, ml)
 
 
 def write_float32_geotiff_js_style(path, bands, band_names, width, height,
-                                    bounds, epsg_code):
-    """Exact replica of writeFloat32GeoTIFF in geotiff-writer.js."""
+                                    bounds, epsg_code, compress_level=1,
+                                    dtype='float32', workers=None):
+    """Exact replica of writeFloat32GeoTIFF in geotiff-writer.js.
+
+    bands is a (num_bands, height, width) float32 array ordered as
+    band_names. compress_level defaults to 1, matching the pako.deflate
+    level used by the JS writer.
+
+    dtype='float16' is an opt-in extension (not in the JS writer): samples
+    are stored as IEEE half floats, halving the bytes fed to deflate.
+    workers sets the deflate thread count (default: os.cpu_count()).
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float16):
+        raise ValueError(f"dtype must be float32 or float16, not {dtype}")
+    bits_per_sample = dtype.itemsize * 8
     type_sizes = {TYPE_SHORT: 2, TYPE_LONG: 4, TYPE_DOUBLE: 8}
     num_bands = len(band_names)
     min_x, min_y, max_x, max_y = bounds
@@ -168,35 +290,86 @@ def write_float32_geotiff_js_style(path, bands, band_names, width, height,
     tiles_x = -(-width // TILE_SIZE)
     tiles_y = -(-height // TILE_SIZE)
     num_tiles = tiles_x * tiles_y
+    # Planar (B, H, W) stack; each tile is a strided slice of it
+    stacked = np.ascontiguousarray(bands, dtype=dtype)
+    # Same-width unsigned view: the empty-tile test must not mistake -0.0
+    # for 0.0, and the numba interleave (no float16 support) only copies bits
+    bits = np.dtype(f'<u{dtype.itemsize}')
+    stacked_bits = stacked.view(bits)
+
+    # Tiles are compressed as they are packed. zlib/libdeflate release the
+    # GIL, so a thread pool runs deflate in parallel; the oldest result is
+    # collected once 2 per worker are in flight, which keeps tile order and
+    # bounds how many raw tiles exist at once.
+    workers = workers or os.cpu_count() or 1
+    max_pending = 2 * workers
     compressed_tiles = []
-
-    for ty in range(tiles_y):
-        for tx in range(tiles_x):
-            x0 = tx * TILE_SIZE
-            y0 = ty * TILE_SIZE
-            tile_w = min(TILE_SIZE, width - x0)
-            tile_h = min(TILE_SIZE, height - y0)
-
-            tile_data = np.zeros(TILE_SIZE * TILE_SIZE * num_bands,
-                                 dtype=np.float32)
-            for py in range(tile_h):
-                for px in range(tile_w):
-                    src_idx = (y0 + py) * width + (x0 + px)
-                    dst_idx = (py * TILE_SIZE + px) * num_bands
-                    for b in range(num_bands):
-                        tile_data[dst_idx + b] = bands[band_names[b]][src_idx]
-
-            compressed = zlib.compress(tile_data.tobytes(), 6)
-            compressed_tiles.append({
-                'data': compressed,
-                'byteCount': len(compressed),
-            })
+    pending = deque()
+    zero_tile = None
+
+    # Scratch tiles reused round-robin, indexed by the count of packed
+    # (non-zero) tiles. After each submit at most max_pending results are
+    # pending, so the buffer of packed tile k - len(scratch) has already been
+    # collected when tile k reuses it. Allocated on first use.
+    scratch = [None] * (max_pending + 1)
+    packed = 0
+
+    def collect(limit):
+        while len(pending) > limit:
+            blob = pending.popleft()
+            compressed_tiles.append(
+                blob if isinstance(blob, bytes) else blob.result())
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for ty in range(tiles_y):
+            for tx in range(tiles_x):
+                x0 = tx * TILE_SIZE
+                y0 = ty * TILE_SIZE
+                tile_w = min(TILE_SIZE, width - x0)
+                tile_h = min(TILE_SIZE, height - y0)
+
+                # All-zero tiles (invalid swath margins) skip packing and
+                # compression; they share one precompressed zero tile
+                if not stacked_bits[:, y0:y0 + tile_h, x0:x0 + tile_w].any():
+                    if zero_tile is None:
+                        zero_tile = deflate(
+                            bytes(TILE_SIZE * TILE_SIZE * num_bands
+                                  * dtype.itemsize), compress_level)
+                    pending.append(zero_tile)
+                    collect(max_pending)
+                    continue
+
+                # Pixel-interleaved (TILE, TILE, B); edge tiles are
+                # zero-padded. The array itself is handed to deflate (no
+                # tobytes() copy).
+                slot = packed % len(scratch)
+                packed += 1
+                tile_data = scratch[slot]
+                if tile_data is None:
+                    tile_data = scratch[slot] = np.zeros(
+                        (TILE_SIZE, TILE_SIZE, num_bands), dtype=dtype)
+                else:
+                    # Clear only the padding a previous tile may have filled
+                    tile_data[tile_h:, :, :] = 0
+                    tile_data[:tile_h, tile_w:, :] = 0
+                if _interleave_tile is not None:
+                    _interleave_tile(tile_data.view(bits), stacked_bits,
+                                     y0, x0, tile_h, tile_w)
+                else:
+                    sub = stacked[:, y0:y0 + tile_h, x0:x0 + tile_w]
+                    tile_data[:tile_h, :tile_w, :] = np.transpose(
+                        sub, (1, 2, 0))
+                pending.append(pool.submit(deflate, tile_data,
+                                           compress_level))
+                collect(max_pending)
+        collect(0)
 
     # IFD entries
     entries = [
         (TAG_IMAGE_WIDTH, TYPE_LONG, 1, [width]),
         (TAG_IMAGE_LENGTH, TYPE_LONG, 1, [height]),
-        (TAG_BITS_PER_SAMPLE, TYPE_SHORT, num_bands, [32] * num_bands),
+        (TAG_BITS_PER_SAMPLE, TYPE_SHORT, num_bands,
+         [bits_per_sample] * num_bands),
         (TAG_COMPRESSION, TYPE_SHORT, 1, [8]),
         (TAG_PHOTOMETRIC, TYPE_SHORT, 1, [1]),
         (TAG_SAMPLES_PER_PIXEL, TYPE_SHORT, 1, [num_bands]),
@@ -205,7 +378,7 @@ def write_float32_geotiff_js_style(path, bands, band_names, width, height,
         (TAG_TILE_LENGTH, TYPE_LONG, 1, [TILE_SIZE]),
         (TAG_TILE_OFFSETS, TYPE_LONG, num_tiles, [0] * num_tiles),
         (TAG_TILE_BYTE_COUNTS, TYPE_LONG, num_tiles,
-         [t['byteCount'] for t in compressed_tiles]),
+         [len(t) for t in compressed_tiles]),
         (TAG_SAMPLE_FORMAT, TYPE_SHORT, num_bands, [3] * num_bands),
         (TAG_MODEL_TIEPOINT, TYPE_DOUBLE, 6,
          [0, 0, 0, min_x, max_y, 0]),
@@ -234,10 +407,22 @@ def write_float32_geotiff_js_style(path, bands, band_names, width, height,
 
     overflow_offset = ifd_offset + ifd_size
     tile_data_offset = overflow_offset + overflow_size
-    total_tile_bytes = sum(t['byteCount'] for t in compressed_tiles)
-    total_size = tile_data_offset + total_tile_bytes
-
-    buf = bytearray(total_size)
+    # Tile offsets: exclusive prefix sum of byte counts past the overflow
+    byte_counts = np.fromiter(map(len, compressed_tiles),
+                              dtype=np.int64, count=num_tiles)
+    # Classic TIFF offsets are 32-bit and the '<u4' cast below would wrap
+    # silently, so refuse files that end past 4 GiB
+    file_size = tile_data_offset + int(byte_counts.sum())
+    if file_size >= 2**32:
+        raise ValueError(f"{file_size} bytes exceeds the 4 GiB classic TIFF "
+                         f"limit (32-bit tile offsets); BigTIFF is not supported")
+    tile_offsets = np.empty(num_tiles, dtype='<u4')
+    tile_offsets[0] = tile_data_offset
+    tile_offsets[1:] = tile_data_offset + np.cumsum(byte_counts[:-1])
+
+    # Only header + IFD + overflow are staged in memory; compressed tiles
+    # are streamed straight to the file afterwards
+    buf = bytearray(tile_data_offset)
     struct.pack_into('<2sHI', buf, 0, b'II', 42, ifd_offset)
 
     pos = ifd_offset
@@ -250,7 +435,11 @@ def write_float32_geotiff_js_style(path, bands, band_names, width, height,
         struct.pack_into('<HHI', buf, pos, tag, typ, count)
         pos += 8
 
-        if byte_size <= 4:
+        if tag == TAG_TILE_OFFSETS and byte_size <= 4:
+            # A single tile's offset fits inline
+            struct.pack_into('<I', buf, pos, int(tile_offsets[0]))
+            pos += 4
+        elif byte_size <= 4:
             if count == 1:
                 if typ == TYPE_SHORT:
                     struct.pack_into('<H', buf, pos, int(values[0]))
@@ -263,46 +452,74 @@ def write_float32_geotiff_js_style(path, bands, band_names, width, height,
         elif tag == TAG_TILE_OFFSETS:
             struct.pack_into('<I', buf, pos, cur_overflow)
             pos += 4
-            tile_pos = tile_data_offset
-            for j in range(len(compressed_tiles)):
-                struct.pack_into('<I', buf, cur_overflow, tile_pos)
-                cur_overflow += 4
-                tile_pos += compressed_tiles[j]['byteCount']
+            buf[cur_overflow:cur_overflow + byte_size] = tile_offsets.tobytes()
+            cur_overflow += byte_size
             if cur_overflow % 2 != 0:
                 cur_overflow += 1
         else:
             struct.pack_into('<I', buf, pos, cur_overflow)
             pos += 4
-            opos = cur_overflow
-            for v in values:
-                if typ == TYPE_SHORT:
-                    struct.pack_into('<H', buf, opos, int(v))
-                    opos += 2
-                elif typ == TYPE_LONG:
-                    struct.pack_into('<I', buf, opos, int(v))
-                    opos += 4
-                elif typ == TYPE_DOUBLE:
-                    struct.pack_into('<d', buf, opos, float(v))
-                    opos += 8
+            buf[cur_overflow:cur_overflow + byte_size] = np.asarray(
+                values, dtype=TYPE_DTYPES[typ]).tobytes()
             cur_overflow += byte_size
             if cur_overflow % 2 != 0:
                 cur_overflow += 1
 
     struct.pack_into('<I', buf, pos, 0)
 
-    tile_write_pos = tile_data_offset
-    for tile in compressed_tiles:
-        buf[tile_write_pos:tile_write_pos + tile['byteCount']] = tile['data']
-        tile_write_pos += tile['byteCount']
-
-    with open(path, 'wb') as f:
+    # Header section, then tile data (contiguous, in offset order); the
+    # 8 MiB buffer coalesces the many small tile writes
+    with open(path, 'wb', buffering=8 << 20) as f:
         f.write(buf)
+        f.writelines(compressed_tiles)
 
     return pixel_scale_x, pixel_scale_y
 
 
-def test_nisar_pipeline(h5_path, ml=4):
-    """Test full SARdine export pipeline with a real NISAR file."""
+def test_writer_zero_tiles():
+    """Mixed all-zero / non-zero tiles through the writer with one worker.
+
+    Zero tiles bypass packing, so the scratch-buffer rotation must not hand
+    a tile still being compressed to the next packed tile. Random float32
+    data, two tile rows (NZ NZ NZ Z NZ / Z NZ Z Z NZ), decoded by rasterio.
+    """
+    print(f"\n{'='*70}")
+    print(f"  Writer Test: mixed zero / non-zero tiles, 1 worker")
+    print(f"{'='*70}")
+
+    rng = np.random.default_rng(0)
+    layout = [[1, 1, 1, 0, 1], [0, 1, 0, 0, 1]]
+    height, width = len(layout) * TILE_SIZE, len(layout[0]) * TILE_SIZE - 100
+    bands = rng.random((2, height, width), dtype=np.float32)
+    for ty, row in enumerate(layout):
+        for tx, nonzero in enumerate(row):
+            if not nonzero:
+                bands[:, ty * TILE_SIZE:(ty + 1) * TILE_SIZE,
+                      tx * TILE_SIZE:(tx + 1) * TILE_SIZE] = 0
+
+    # Scratch output only: nothing is left behind in test/data
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pipeline_zero_tiles_js.tif')
+        write_float32_geotiff_js_style(path, bands, ['A', 'B'], width, height,
+                                       [0, 0, width, height], 32611, workers=1)
+        try:
+            with rasterio.open(path) as src:
+                ok = np.array_equal(src.read(), bands)
+        except rasterio.errors.RasterioIOError as e:
+            ok = False
+            print(f"    {e}")
+    print(f"    [{'PASS' if ok else 'FAIL'}] decoded data matches source")
+    return ok
+
+
+def test_nisar_pipeline(h5_path, ml=4, write_ref=False, float16=False):
+    """Test full SARdine export pipeline with a real NISAR file.
+
+    With write_ref, a rasterio reference GeoTIFF is also written and
+    compared against; otherwise the JS-style file is checked directly
+    against the source stripes. With float16, a half-float variant is
+    also written and checked.
+    """
     basename = os.path.basename(h5_path)
     print(f"\n{'='*70}")
     print(f"  Pipeline Test: {basename}")
@@ -361,15 +578,31 @@ def test_nisar_pipeline(h5_path, ml=4):
     print(f"\n  Reading {max_export_rows} rows of {len(band_names)} bands "
           f"({', '.join(band_names)})...")
 
-    bands = {}
-    for pol in band_names:
-        print(f"    Reading {pol}...", end='', flush=True)
-        stripe = read_nisar_band_stripe(
-            h5_path, meta, pol, 0, max_export_rows, effective_ml)
-        bands[pol] = stripe
-        valid = stripe[stripe > 0]
-        print(f" done. range=[{stripe.min():.4e}, {stripe.max():.4e}], "
-              f"{len(valid)}/{len(stripe)} valid")
+    # Bands are multilooked straight into one (B, H, W) stack, the layout
+    # the writer tiles from
+    bands = np.empty((len(band_names), max_export_rows, export_width),
+                     dtype=np.float32)
+    # One file handle for all bands (metadata parsed once, chunk cache
+    # shared). A reader thread prefetches the next band's HDF5 stripe while
+    # this thread multilooks the current one (one block in flight at a time)
+    cache = h5_chunk_cache(meta, max_export_rows, effective_ml)
+    with h5py.File(h5_path, 'r', **cache) as h5f, \
+            ThreadPoolExecutor(max_workers=1) as reader:
+        def prefetch(pol):
+            return reader.submit(read_stripe_block, h5f, meta, pol,
+                                 0, max_export_rows, effective_ml)
+
+        pending = prefetch(band_names[0])
+        for i, pol in enumerate(band_names):
+            print(f"    Reading {pol}...", end='', flush=True)
+            block = pending.result()
+            if i + 1 < len(band_names):
+                pending = prefetch(band_names[i + 1])
+            stripe = multilook_stripe(block, max_export_rows, export_width,
+                                      effective_ml, out=bands[i])
+            valid = stripe[stripe > 0]
+            print(f" done. range=[{stripe.min():.4e}, {stripe.max():.4e}], "
+                  f"{len(valid)}/{len(stripe)} valid")
 
     test_width = export_width
     test_height = max_export_rows
@@ -393,125 +626,179 @@ def test_nisar_pipeline(h5_path, ml=4):
     print(f"    File size: {os.path.getsize(js_path)} bytes")
     print(f"    Pixel scale written: {ps_x:.6f} x {ps_y:.6f}")
 
-    # Step 5: Write with rasterio
-    ref_path = f'test/data/pipeline_{basename.split(".")[0]}_ref.tif'
-    print(f"\n  Writing reference: {ref_path}")
-    transform = from_bounds(
-        subset_bounds[0], subset_bounds[1],
-        subset_bounds[2], subset_bounds[3],
-        test_width, test_height)
-
-    with rasterio.open(
-        ref_path, 'w', driver='GTiff',
-        width=test_width, height=test_height,
-        count=len(band_names), dtype='float32',
-        crs=CRS.from_epsg(meta['epsg']),
-        transform=transform,
-        tiled=True, blockxsize=512, blockysize=512,
-        compress='deflate',
-    ) as dst:
-        for i, name in enumerate(band_names):
-            data_2d = bands[name].reshape((test_height, test_width))
-            dst.write(data_2d, i + 1)
-
-    print(f"    File size: {os.path.getsize(ref_path)} bytes")
-
-    # Step 6: Load both in rasterio and compare
-    print(f"\n  {'─'*50}")
-    print(f"  RASTERIO COMPARISON")
-    print(f"  {'─'*50}")
-
     all_pass = True
 
-    with rasterio.open(js_path) as js_src, \
-         rasterio.open(ref_path) as ref_src:
-
-        # Profile
-        for key in ['driver', 'dtype', 'width', 'height', 'count',
-                     'blockxsize', 'blockysize', 'tiled']:
-            js_val = js_src.profile.get(key)
-            ref_val = ref_src.profile.get(key)
-            ok = js_val == ref_val
-            if not ok:
-                all_pass = False
-            print(f"    [{'PASS' if ok else 'FAIL'}] {key}: "
-                  f"JS={js_val} REF={ref_val}")
-
-        print(f"    [INFO] JS  interleave: {js_src.interleaving}")
-        print(f"    [INFO] REF interleave: {ref_src.interleaving}")
-
-        # Transform
-        js_t = js_src.transform
-        ref_t = ref_src.transform
-        for attr, name in [('a', 'pixel_x'), ('c', 'origin_x'),
-                           ('e', 'pixel_y'), ('f', 'origin_y')]:
-            js_v = getattr(js_t, attr)
-            ref_v = getattr(ref_t, attr)
-            ok = abs(js_v - ref_v) < 0.01
-            if not ok:
-                all_pass = False
-            print(f"    [{'PASS' if ok else 'FAIL'}] {name}: "
-                  f"JS={js_v:.4f} REF={ref_v:.4f}")
-
-        # CRS
-        js_epsg = js_src.crs.to_epsg() if js_src.crs else None
-        ref_epsg = ref_src.crs.to_epsg() if ref_src.crs else None
-        ok = js_epsg == ref_epsg == meta['epsg']
+    if float16:
+        # Half-float variant: must decode to exactly the float16-rounded
+        # source (GDAL < 3.11 exposes 16-bit float TIFFs as Float32)
+        js16_path = f'test/data/pipeline_{basename.split(".")[0]}_js16.tif'
+        print(f"\n  Writing JS-style float16: {js16_path}")
+        write_float32_geotiff_js_style(
+            js16_path, bands, band_names, test_width, test_height,
+            subset_bounds, meta['epsg'], dtype='float16')
+        print(f"    File size: {os.path.getsize(js16_path)} bytes")
+        try:
+            with rasterio.open(js16_path) as src16:
+                data16 = src16.read().astype(np.float32)
+            ok = np.array_equal(
+                data16, bands.astype(np.float16).astype(np.float32))
+        except rasterio.errors.RasterioIOError as e:
+            ok = False
+            print(f"    {e}")
         if not ok:
             all_pass = False
-        print(f"    [{'PASS' if ok else 'FAIL'}] EPSG: "
-              f"JS={js_epsg} REF={ref_epsg} expected={meta['epsg']}")
-
-        # Bounds
-        js_b = js_src.bounds
-        ref_b = ref_src.bounds
-        for name, js_v, ref_v in [
-            ('left', js_b.left, ref_b.left),
-            ('bottom', js_b.bottom, ref_b.bottom),
-            ('right', js_b.right, ref_b.right),
-            ('top', js_b.top, ref_b.top),
-        ]:
-            ok = abs(js_v - ref_v) < 0.01
+        print(f"    [{'PASS' if ok else 'FAIL'}] float16 data matches "
+              f"float16-rounded source")
+
+    if write_ref:
+        # Step 5: Write with rasterio
+        ref_path = f'test/data/pipeline_{basename.split(".")[0]}_ref.tif'
+        print(f"\n  Writing reference: {ref_path}")
+        transform = from_bounds(
+            subset_bounds[0], subset_bounds[1],
+            subset_bounds[2], subset_bounds[3],
+            test_width, test_height)
+
+        with rasterio.open(
+            ref_path, 'w', driver='GTiff',
+            width=test_width, height=test_height,
+            count=len(band_names), dtype='float32',
+            crs=CRS.from_epsg(meta['epsg']),
+            transform=transform,
+            tiled=True, blockxsize=512, blockysize=512,
+            compress='deflate', zlevel=1, num_threads='all_cpus',
+        ) as dst:
+            dst.write(bands)
+
+        print(f"    File size: {os.path.getsize(ref_path)} bytes")
+
+        # Step 6: Load both in rasterio and compare
+        print(f"\n  {'─'*50}")
+        print(f"  RASTERIO COMPARISON")
+        print(f"  {'─'*50}")
+
+        with rasterio.open(js_path) as js_src, \
+             rasterio.open(ref_path) as ref_src:
+
+            # Profile
+            for key in ['driver', 'dtype', 'width', 'height', 'count',
+                         'blockxsize', 'blockysize', 'tiled']:
+                js_val = js_src.profile.get(key)
+                ref_val = ref_src.profile.get(key)
+                ok = js_val == ref_val
+                if not ok:
+                    all_pass = False
+                print(f"    [{'PASS' if ok else 'FAIL'}] {key}: "
+                      f"JS={js_val} REF={ref_val}")
+
+            print(f"    [INFO] JS  interleave: {js_src.interleaving}")
+            print(f"    [INFO] REF interleave: {ref_src.interleaving}")
+
+            # Transform
+            js_t = js_src.transform
+            ref_t = ref_src.transform
+            for attr, name in [('a', 'pixel_x'), ('c', 'origin_x'),
+                               ('e', 'pixel_y'), ('f', 'origin_y')]:
+                js_v = getattr(js_t, attr)
+                ref_v = getattr(ref_t, attr)
+                ok = abs(js_v - ref_v) < 0.01
+                if not ok:
+                    all_pass = False
+                print(f"    [{'PASS' if ok else 'FAIL'}] {name}: "
+                      f"JS={js_v:.4f} REF={ref_v:.4f}")
+
+            # CRS
+            js_epsg = js_src.crs.to_epsg() if js_src.crs else None
+            ref_epsg = ref_src.crs.to_epsg() if ref_src.crs else None
+            ok = js_epsg == ref_epsg == meta['epsg']
             if not ok:
                 all_pass = False
-            print(f"    [{'PASS' if ok else 'FAIL'}] bounds.{name}: "
-                  f"JS={js_v:.2f} REF={ref_v:.2f}")
+            print(f"    [{'PASS' if ok else 'FAIL'}] EPSG: "
+                  f"JS={js_epsg} REF={ref_epsg} expected={meta['epsg']}")
+
+            # Bounds
+            js_b = js_src.bounds
+            ref_b = ref_src.bounds
+            for name, js_v, ref_v in [
+                ('left', js_b.left, ref_b.left),
+                ('bottom', js_b.bottom, ref_b.bottom),
+                ('right', js_b.right, ref_b.right),
+                ('top', js_b.top, ref_b.top),
+            ]:
+                ok = abs(js_v - ref_v) < 0.01
+                if not ok:
+                    all_pass = False
+                print(f"    [{'PASS' if ok else 'FAIL'}] bounds.{name}: "
+                      f"JS={js_v:.2f} REF={ref_v:.2f}")
+
+            # Data comparison
+            print(f"\n  Band data comparison:")
+            for bi in range(1, len(band_names) + 1):
+                name = band_names[bi - 1]
+                try:
+                    js_data = js_src.read(bi)
+                    ref_data = ref_src.read(bi)
+                    diff = np.abs(js_data - ref_data)
+                    max_diff = np.max(diff)
+                    ok = max_diff < 1e-5
+                    if not ok:
+                        all_pass = False
+                    print(f"    [{'PASS' if ok else 'FAIL'}] {name}: "
+                          f"max_diff={max_diff:.2e}, "
+                          f"JS range=[{js_data.min():.4e},{js_data.max():.4e}], "
+                          f"REF range=[{ref_data.min():.4e},{ref_data.max():.4e}]")
+                except Exception as e:
+                    all_pass = False
+                    print(f"    [FAIL] {name}: {e}")
+
+            # Spot checks
+            print(f"\n  Spot checks (band 1):")
+            js_d = js_src.read(1)
+            ref_d = ref_src.read(1)
+            for py, px, label in [(0, 0, "UL"), (0, test_width-1, "UR"),
+                                   (test_height-1, 0, "LL"),
+                                   (test_height-1, test_width-1, "LR"),
+                                   (test_height//2, test_width//2, "center")]:
+                js_v = js_d[py, px]
+                ref_v = ref_d[py, px]
+                ok = abs(js_v - ref_v) < 1e-6
+                if not ok:
+                    all_pass = False
+                print(f"    [{'PASS' if ok else 'FAIL'}] {label} "
+                      f"({px},{py}): JS={js_v:.6e} REF={ref_v:.6e}")
 
-        # Data comparison
-        print(f"\n  Band data comparison:")
-        for bi in range(1, len(band_names) + 1):
-            name = band_names[bi - 1]
-            try:
-                js_data = js_src.read(bi)
-                ref_data = ref_src.read(bi)
-                diff = np.abs(js_data - ref_data)
-                max_diff = np.max(diff)
-                ok = max_diff < 1e-5
+    else:
+        # Step 5/6 without a reference: decode the JS file and compare it
+        # directly against the stripes it was written from
+        print(f"\n  {'─'*50}")
+        print(f"  RASTERIO vs SOURCE STRIPES")
+        print(f"  {'─'*50}")
+
+        with rasterio.open(js_path) as js_src:
+            for key, expected in [('dtype', 'float32'),
+                                  ('width', test_width),
+                                  ('height', test_height),
+                                  ('count', len(band_names)),
+                                  ('blockxsize', TILE_SIZE),
+                                  ('blockysize', TILE_SIZE),
+                                  ('tiled', True)]:
+                js_val = js_src.profile.get(key)
+                ok = js_val == expected
                 if not ok:
                     all_pass = False
-                print(f"    [{'PASS' if ok else 'FAIL'}] {name}: "
-                      f"max_diff={max_diff:.2e}, "
-                      f"JS range=[{js_data.min():.4e},{js_data.max():.4e}], "
-                      f"REF range=[{ref_data.min():.4e},{ref_data.max():.4e}]")
-            except Exception as e:
-                all_pass = False
-                print(f"    [FAIL] {name}: {e}")
-
-        # Spot checks
-        print(f"\n  Spot checks (band 1):")
-        js_d = js_src.read(1)
-        ref_d = ref_src.read(1)
-        for py, px, label in [(0, 0, "UL"), (0, test_width-1, "UR"),
-                               (test_height-1, 0, "LL"),
-                               (test_height-1, test_width-1, "LR"),
-                               (test_height//2, test_width//2, "center")]:
-            js_v = js_d[py, px]
-            ref_v = ref_d[py, px]
-            ok = abs(js_v - ref_v) < 1e-6
+                print(f"    [{'PASS' if ok else 'FAIL'}] {key}: "
+                      f"JS={js_val} expected={expected}")
+
+            js_all = js_src.read()
+
+        print(f"\n  Band data comparison:")
+        for bi, name in enumerate(band_names):
+            expected = bands[bi]
+            ok = np.array_equal(js_all[bi], expected)
             if not ok:
                 all_pass = False
-            print(f"    [{'PASS' if ok else 'FAIL'}] {label} "
-                  f"({px},{py}): JS={js_v:.6e} REF={ref_v:.6e}")
+            print(f"    [{'PASS' if ok else 'FAIL'}] {name}: "
+                  f"max_diff={np.max(np.abs(js_all[bi] - expected)):.2e}")
 
     # Step 7: Verify against HDF5 source
     print(f"\n  {'─'*50}")
@@ -570,11 +857,20 @@ def test_nisar_pipeline(h5_path, ml=4):
 
 
 def main():
+    parser = argparse.ArgumentParser(description='SARdine export pipeline test')
+    parser.add_argument('h5_path', nargs='?',
+                        help='NISAR GCOV HDF5 file (default: known test files)')
+    parser.add_argument('--write-ref', action='store_true',
+                        help='Also write a rasterio reference GeoTIFF and '
+                             'compare against it')
+    parser.add_argument('--float16', action='store_true',
+                        help='Also write and check a float16 variant')
+    args = parser.parse_args()
+
     os.makedirs('test/data', exist_ok=True)
 
-    h5_path = sys.argv[1] if len(sys.argv) > 1 else None
-    if h5_path:
-        files = [h5_path]
+    if args.h5_path:
+        files = [args.h5_path]
     else:
         files = [f for f in H5_FILES if os.path.exists(f)]
 
@@ -582,11 +878,13 @@ def main():
         print("No HDF5 files found. Provide a path or place files in test/data/")
         sys.exit(1)
 
-    results = {}
+    results = {'writer: mixed zero tiles, 1 worker': test_writer_zero_tiles()}
     for f in files:
         for ml in [4, 8]:
             key = f"{os.path.basename(f)} ml={ml}"
-            results[key] = test_nisar_pipeline(f, ml=ml)
+            results[key] = test_nisar_pipeline(f, ml=ml,
+                                               write_ref=args.write_ref,
+                                               float16=args.float16)
 
     # Final summary
     print(f"\n\n{'='*70}")
@@ -7,11 +7,12 @@ so we can compare against the expected values from the HDF5 source.
 
 Usage:
     python3 test/scripts/verify-georef.py test/data/test_georef.tif
-    python3 scripts/verify-georef.py path/to/exported.tif
+    python3 scripts/verify-georef.py path/to/exported.tif [more.tif ...]
 """
 
 import sys
 import os
+from functools import lru_cache
 
 try:
     import rasterio
@@ -26,6 +27,13 @@ try:
 except ImportError:
     HAS_PYPROJ = False
 
+
+@lru_cache(maxsize=64)
+def _get_transformer(epsg):
+    """EPSG -> WGS84 transformer, built once per EPSG (PROJ setup is slow)."""
+    return Transformer.from_crs(f"EPSG:{epsg}", "EPSG:4326", always_xy=True)
+
+
 def verify_geotiff(filepath):
     if not os.path.exists(filepath):
         print(f"ERROR: File not found: {filepath}")
@@ -71,26 +79,24 @@ def verify_geotiff(filepath):
         print(f"  Lower-right: ({lr[0]:.2f}, {lr[1]:.2f})")
 
         # --- CRS ---
+        # to_epsg() searches the PROJ database, so look it up once
+        epsg = src.crs.to_epsg() if src.crs else None
         print(f"\nCRS:")
         print(f"  {src.crs}")
-        if src.crs and src.crs.to_epsg():
-            print(f"  EPSG: {src.crs.to_epsg()}")
+        if epsg:
+            print(f"  EPSG: {epsg}")
 
         # --- Convert to lat/lon ---
-        if HAS_PYPROJ and src.crs and src.crs.to_epsg() and src.crs.to_epsg() != 4326:
-            epsg = src.crs.to_epsg()
-            transformer = Transformer.from_crs(f"EPSG:{epsg}", "EPSG:4326", always_xy=True)
+        if HAS_PYPROJ and epsg and epsg != 4326:
+            transformer = _get_transformer(epsg)
 
-            corners = [
-                ("Upper-left", ul),
-                ("Upper-right", ur),
-                ("Lower-left", ll),
-                ("Lower-right", lr),
-            ]
+            names = ["Upper-left", "Upper-right", "Lower-left", "Lower-right"]
+            # All four corners in one transform call
+            lons, lats = transformer.transform(
+                [ul[0], ur[0], ll[0], lr[0]], [ul[1], ur[1], ll[1], lr[1]])
 
             print(f"\nCorner coordinates (lat/lon, WGS84):")
-            for name, (cx, cy) in corners:
-                lon, lat = transformer.transform(cx, cy)
+            for name, lon, lat in zip(names, lons, lats):
                 print(f"  {name}:  ({lon:.6f}, {lat:.6f})  [lon, lat]")
 
         # --- NISAR expected values for comparison ---
@@ -131,7 +137,8 @@ def verify_geotiff(filepath):
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
-        print("Usage: python3 test/scripts/verify-georef.py <geotiff-file>")
+        print("Usage: python3 test/scripts/verify-georef.py <geotiff-file> [...]")
         sys.exit(1)
 
-    verify_geotiff(sys.argv[1])
+    for path in sys.argv[1:]:
+        verify_geotiff(path)